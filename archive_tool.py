@@ -3,19 +3,76 @@ import argparse
 import io
 import datetime as dt
 import json
+import mmap
 import os
 import re
 import sys
+import time
 import zipfile
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import contextmanager
+from functools import lru_cache
 from json import JSONDecoder
+from operator import itemgetter
 
-CHUNK_SIZE = 1024 * 1024
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+CHUNK_SIZE = 4 * 1024 * 1024
+BUF_COMPACT_BYTES = 1024 * 1024
 LARGE_INPUT_FALLBACK_LIMIT = 128 * 1024 * 1024
+DAY_FLUSH_LINES = 4096
+DAY_FLUSH_TOTAL_BYTES = 16 * 1024 * 1024
+WRITE_BUFFER_SIZE = 1 << 20
+DAY_HANDLE_CACHE_SIZE = 64
+CONVERSATION_CHUNK_SIZE = 256
 TOPIC_TRIGGERS_DEFAULT = ["对了", "话说回来", "顺便", "另外", "再说", "哦对", "换个话题", "题外话"]
 
+_TS_RE = re.compile(r"\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]")
+_WS_RE = re.compile(r"\s+")
+_FNAME_RE = re.compile(r"[^0-9A-Za-z\u4e00-\u9fa5_-]+")
+_UNDERSCORE_RE = re.compile(r"_+")
+_TRIGGER_RE_CACHE = {}
+
+
+def compile_trigger_regex(triggers):
+    key = tuple(triggers)
+    trig_re = _TRIGGER_RE_CACHE.get(key)
+    if trig_re is None:
+        trig_re = re.compile("|".join(re.escape(t) for t in key))
+        _TRIGGER_RE_CACHE[key] = trig_re
+    return trig_re
+
+
+@lru_cache(maxsize=1024)
+def _hour_epoch(year, month, day, hour):
+    return int(dt.datetime(year, month, day, hour).timestamp())
+
+
+def parse_line_timestamp(s):
+    # fixed "YYYY-MM-DD HH:MM:SS" layout; slicing the digits directly is
+    # far cheaper than strptime, and the hour epoch is memoized
+    try:
+        base = _hour_epoch(int(s[0:4]), int(s[5:7]), int(s[8:10]), int(s[11:13]))
+        return base + int(s[14:16]) * 60 + int(s[17:19])
+    except (ValueError, OverflowError, OSError):
+        return None
+
 
 def safe_int(v, default=0):
+    # fast paths first: exception setup dominates when this runs per line
+    if type(v) is int:
+        return v
+    if type(v) is str and v and (v.isdecimal() or (v[0] == "-" and v[1:].isdecimal())):
+        return int(v)
     try:
         return int(v)
     except Exception:
@@ -27,22 +84,24 @@ def safe_int(v, default=0):
 
 def safe_slug(value, fallback="item"):
     text = str(value or "").strip()
-    text = re.sub(r"\s+", "_", text)
-    text = re.sub(r"[^0-9A-Za-z\u4e00-\u9fa5_-]+", "_", text)
-    text = re.sub(r"_+", "_", text).strip("_")
+    text = _WS_RE.sub("_", text)
+    text = _FNAME_RE.sub("_", text)
+    text = _UNDERSCORE_RE.sub("_", text).strip("_")
     return (text or fallback)[:80]
 
 
 def normalize_timestamp(ts):
     if ts is None:
         return 0
-    try:
-        t = float(ts)
-    except Exception:
-        return 0
-    if t > 1e12:
-        t = t / 1000.0
-    return int(t)
+    kind = type(ts)
+    if kind is not int and kind is not float:
+        try:
+            ts = float(ts)
+        except Exception:
+            return 0
+    if ts > 1e12:
+        ts = ts / 1000.0
+    return int(ts)
 
 
 def extract_text_content(content):
@@ -65,17 +124,22 @@ def extract_text_content(content):
     return ""
 
 
-def normalize_message(msg, node_id=None):
-    role = (msg.get("author", {}) or {}).get("role") or msg.get("role") or "assistant"
-    content = extract_text_content(msg.get("content"))
+def message_timestamp(msg):
     ts = msg.get("create_time")
     if not ts:
-        meta = msg.get("metadata", {}) or {}
+        meta = msg.get("metadata") or {}
         ts = meta.get("timestamp") or meta.get("timestamp_")
+    return normalize_timestamp(ts)
+
+
+def normalize_message(msg, node_id=None):
+    author = msg.get("author") or {}
+    role = author.get("role") or msg.get("role") or "assistant"
+    content = extract_text_content(msg.get("content"))
     out = {
         "role": role,
         "content": (content or "").strip(),
-        "ts": normalize_timestamp(ts)
+        "ts": message_timestamp(msg)
     }
     if node_id:
         out["node_id"] = node_id
@@ -83,37 +147,36 @@ def normalize_message(msg, node_id=None):
 
 
 def get_node_message_timestamp(node):
-    if not node or not node.get("message"):
+    if not node:
         return 0
-    msg = node.get("message") or {}
-    raw_ts = msg.get("create_time")
-    if not raw_ts:
-        meta = msg.get("metadata", {}) or {}
-        raw_ts = meta.get("timestamp") or meta.get("timestamp_")
-    return normalize_timestamp(raw_ts)
+    msg = node.get("message")
+    if not msg:
+        return 0
+    return message_timestamp(msg)
 
 
-def get_latest_subtree_timestamp(node_id, mapping, cache, stack):
-    if not node_id or node_id not in mapping:
-        return 0
-    if node_id in cache:
-        return cache[node_id]
-    if node_id in stack:
-        return get_node_message_timestamp(mapping.get(node_id))
-    stack.add(node_id)
-    node = mapping.get(node_id) or {}
-    best_ts = get_node_message_timestamp(node)
-    for child_id in node.get("children", []) or []:
-        child_ts = get_latest_subtree_timestamp(child_id, mapping, cache, stack)
-        if child_ts > best_ts:
-            best_ts = child_ts
-    stack.remove(node_id)
-    cache[node_id] = best_ts
-    return best_ts
+def build_tree_index(mapping):
+    # flatten the dict-of-dicts mapping into parent/children/ts lookups so
+    # the repeated traversals below stop re-chasing nested dict chains;
+    # children are pre-filtered to ids actually present in the mapping
+    parent = {}
+    children = {}
+    ts = {}
+    for node_id, node in mapping.items():
+        node = node or {}
+        parent[node_id] = node.get("parent")
+        children[node_id] = [c for c in (node.get("children") or []) if c in mapping]
+        ts[node_id] = get_node_message_timestamp(node)
+    return parent, children, ts
 
 
-def find_root_ids(mapping):
+def find_root_ids(mapping, parent=None):
     roots = []
+    if parent is not None:
+        for node_id, parent_id in parent.items():
+            if parent_id is None or parent_id not in parent:
+                roots.append(node_id)
+        return roots or list(parent.keys())[:1]
     for node_id, node in mapping.items():
         parent_id = (node or {}).get("parent")
         if parent_id is None or parent_id not in mapping:
@@ -121,58 +184,62 @@ def find_root_ids(mapping):
     return roots or list(mapping.keys())[:1]
 
 
-def collect_path_to_root(mapping, node_id):
+def collect_path_to_root(mapping, node_id, index=None):
     if not node_id or node_id not in mapping:
         return []
+    parent = index[0] if index else None
     ids = []
     seen = set()
     while node_id and node_id not in seen and node_id in mapping:
         seen.add(node_id)
         ids.append(node_id)
-        node_id = (mapping.get(node_id) or {}).get("parent")
+        if parent is not None:
+            node_id = parent.get(node_id)
+        else:
+            node_id = (mapping.get(node_id) or {}).get("parent")
     ids.reverse()
     return ids
 
 
-def build_latest_subtree_cache(mapping):
+def build_latest_subtree_cache(mapping, index=None):
+    _, children_of, node_ts = index or build_tree_index(mapping)
     cache = {}
     visiting = set()
-    for start_id in list(mapping.keys()):
+    for start_id in mapping:
         if start_id in cache:
             continue
         stack = [(start_id, False)]
         while stack:
             node_id, expanded = stack.pop()
-            if node_id in cache or node_id not in mapping:
+            if node_id in cache:
                 continue
-            node = mapping.get(node_id) or {}
             if expanded:
-                best_ts = get_node_message_timestamp(node)
-                for child_id in node.get("children", []) or []:
-                    if child_id in mapping:
-                        child_ts = cache.get(child_id, get_node_message_timestamp(mapping.get(child_id)))
-                        if child_ts > best_ts:
-                            best_ts = child_ts
+                best_ts = node_ts[node_id]
+                for child_id in children_of[node_id]:
+                    child_ts = cache.get(child_id, node_ts[child_id])
+                    if child_ts > best_ts:
+                        best_ts = child_ts
                 cache[node_id] = best_ts
                 visiting.discard(node_id)
                 continue
             if node_id in visiting:
-                cache[node_id] = get_node_message_timestamp(node)
+                cache[node_id] = node_ts[node_id]
                 continue
             visiting.add(node_id)
             stack.append((node_id, True))
-            for child_id in reversed(node.get("children", []) or []):
-                if child_id in mapping and child_id not in cache:
+            for child_id in reversed(children_of[node_id]):
+                if child_id not in cache:
                     stack.append((child_id, False))
     return cache
 
 
-def collect_latest_branch_path(mapping):
-    all_ids = list(mapping.keys())
-    if not all_ids:
+def collect_latest_branch_path(mapping, index=None):
+    if not mapping:
         return []
-    cache = build_latest_subtree_cache(mapping)
-    root_ids = find_root_ids(mapping)
+    index = index or build_tree_index(mapping)
+    parent, children_of, _ = index
+    cache = build_latest_subtree_cache(mapping, index=index)
+    root_ids = find_root_ids(mapping, parent=parent)
     root_id = max(root_ids, key=lambda item: (cache.get(item, 0), str(item)))
     ids = []
     visited = set()
@@ -180,27 +247,24 @@ def collect_latest_branch_path(mapping):
     while node_id and node_id not in visited and node_id in mapping:
         visited.add(node_id)
         ids.append(node_id)
-        node = mapping.get(node_id) or {}
-        children = [child for child in (node.get("children", []) or []) if child in mapping]
+        children = children_of[node_id]
         if not children:
             break
         node_id = max(children, key=lambda item: (cache.get(item, 0), str(item)))
     return ids
 
 
-def collect_leaf_branch_paths(mapping):
+def collect_leaf_branch_paths(mapping, index=None):
     if not mapping:
         return []
-    cache = build_latest_subtree_cache(mapping)
+    index = index or build_tree_index(mapping)
+    parent, children_of, _ = index
+    cache = build_latest_subtree_cache(mapping, index=index)
     paths = []
-    stack = [(root_id, [root_id]) for root_id in reversed(find_root_ids(mapping))]
+    stack = [(root_id, [root_id]) for root_id in reversed(find_root_ids(mapping, parent=parent))]
     while stack:
         node_id, path = stack.pop()
-        node = mapping.get(node_id) or {}
-        children = [
-            child for child in (node.get("children", []) or [])
-            if child in mapping and child not in path
-        ]
+        children = [child for child in children_of[node_id] if child not in path]
         if not children:
             paths.append(path)
             continue
@@ -256,15 +320,15 @@ def path_has_user_edit(mapping, path_ids):
     return any(item.get("type") == "edit" for item in get_path_version_events(mapping, path_ids))
 
 
-def collect_edited_branch_paths(mapping, current_path):
-    paths = [path for path in collect_leaf_branch_paths(mapping) if path_has_user_edit(mapping, path)]
+def collect_edited_branch_paths(mapping, current_path, index=None):
+    paths = [path for path in collect_leaf_branch_paths(mapping, index=index) if path_has_user_edit(mapping, path)]
     current_key = tuple(current_path or [])
     if current_key and path_has_user_edit(mapping, current_path):
         if current_key not in {tuple(path) for path in paths}:
             paths.append(current_path)
     if paths:
         return paths
-    return [current_path or collect_latest_branch_path(mapping)]
+    return [current_path or collect_latest_branch_path(mapping, index=index)]
 
 
 def path_to_messages(mapping, path_ids):
@@ -365,15 +429,16 @@ def iter_conversation_branches(conv, branch_mode="active"):
         return
 
     mapping = conv.get("mapping") or {}
-    current_path = collect_path_to_root(mapping, conv.get("current_node"))
-    latest_path = collect_latest_branch_path(mapping)
+    index = build_tree_index(mapping)
+    current_path = collect_path_to_root(mapping, conv.get("current_node"), index=index)
+    latest_path = collect_latest_branch_path(mapping, index=index)
 
     if branch_mode == "all":
-        paths = collect_leaf_branch_paths(mapping)
+        paths = collect_leaf_branch_paths(mapping, index=index)
         if current_path and tuple(current_path) not in {tuple(path) for path in paths}:
             paths.append(current_path)
     elif branch_mode == "edits":
-        paths = collect_edited_branch_paths(mapping, current_path)
+        paths = collect_edited_branch_paths(mapping, current_path, index=index)
     elif branch_mode == "latest":
         paths = [latest_path]
     else:
@@ -481,10 +546,37 @@ def open_input_text(path):
         yield f
 
 
+def read_payload_bytes(path):
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            member = find_zip_conversations_member(zf)
+            return zf.read(member)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def iter_json_array_simdjson(path):
+    parser = simdjson.Parser()
+    doc = parser.parse(read_payload_bytes(path))
+    if not isinstance(doc, simdjson.Array):
+        raise ValueError("input is not a JSON array")
+    for item in doc:
+        yield item.as_dict() if isinstance(item, simdjson.Object) else item
+
+
 def iter_json_array(path):
-    decoder = JSONDecoder()
+    # simdjson parses the whole payload with SIMD tokenization; use it when
+    # available and the payload is small enough to hold in memory
+    if simdjson is not None and input_payload_size(path) < LARGE_INPUT_FALLBACK_LIMIT:
+        yield from iter_json_array_simdjson(path)
+        return
+    raw_decode = JSONDecoder().raw_decode
     with open_input_text(path) as f:
+        # consume via an integer cursor instead of re-slicing the buffer
+        # per object; the consumed prefix is only dropped in bulk, which
+        # keeps buffer maintenance linear instead of quadratic
         buf = ""
+        pos = 0
         # find array start
         while True:
             chunk = f.read(CHUNK_SIZE)
@@ -493,54 +585,92 @@ def iter_json_array(path):
             buf += chunk
             idx = buf.find("[")
             if idx != -1:
-                buf = buf[idx + 1:]
+                pos = idx + 1
                 break
         while True:
             # skip whitespace/commas
-            i = 0
-            while i < len(buf) and buf[i] in " \t\r\n,":
-                i += 1
-            buf = buf[i:]
-            if not buf:
+            size = len(buf)
+            while pos < size and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= size:
                 chunk = f.read(CHUNK_SIZE)
                 if not chunk:
                     return
-                buf += chunk
+                buf = chunk
+                pos = 0
                 continue
-            if buf[0] == "]":
+            if buf[pos] == "]":
                 return
             try:
-                obj, idx = decoder.raw_decode(buf)
+                obj, pos = raw_decode(buf, pos)
             except json.JSONDecodeError:
                 chunk = f.read(CHUNK_SIZE)
                 if not chunk:
                     raise
-                buf += chunk
+                buf = buf[pos:] + chunk
+                pos = 0
                 continue
-            buf = buf[idx:]
             yield obj
+            if pos >= BUF_COMPACT_BYTES:
+                buf = buf[pos:]
+                pos = 0
 
 
 def ensure_dir(path):
     os.makedirs(path, exist_ok=True)
 
 
+# maps newline/carriage-return/tab to spaces so message content cannot
+# break the one-line-per-message, tab-separated raw format
+_LINE_CLEAN = str.maketrans({"\n": " ", "\r": " ", "\t": " "})
+
+
+# consecutive messages mostly share a minute, so memoize the strftime
+# work per minute bucket and rebuild the seconds with integer math; UTC
+# offsets are always whole minutes, so minute buckets never straddle a
+# local date or minute boundary
+@lru_cache(maxsize=16384)
+def _minute_iso_prefix(minute):
+    return dt.datetime.fromtimestamp(minute * 60).strftime("%Y-%m-%d %H:%M:")
+
+
+@lru_cache(maxsize=16384)
+def _minute_day_key(minute):
+    return dt.datetime.fromtimestamp(minute * 60).strftime("%Y-%m-%d")
+
+
 def to_iso(ts):
     if not ts:
         return ""
-    return dt.datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+    return f"{_minute_iso_prefix(ts // 60)}{ts % 60:02d}"
 
 
 def day_key(ts):
     if not ts:
         return "unknown"
-    return dt.datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+    return _minute_day_key(ts // 60)
 
 
 def month_key(ts):
     if not ts:
         return "unknown"
-    return dt.datetime.fromtimestamp(ts).strftime("%Y-%m")
+    return _minute_day_key(ts // 60)[:7]
+
+
+# numpy datetime64 is UTC-based while day_key follows local time, so the
+# vectorized path is only usable when local time is UTC
+_NUMPY_DAY_KEYS_OK = numpy is not None and time.timezone == 0 and time.daylight == 0
+
+
+def day_keys_bulk(ts_list):
+    if not _NUMPY_DAY_KEYS_OK or len(ts_list) < 256:
+        return [day_key(ts) for ts in ts_list]
+    arr = numpy.asarray(ts_list, dtype="int64")
+    keys = arr.astype("datetime64[s]").astype("datetime64[D]").astype(str).tolist()
+    for i, ts in enumerate(ts_list):
+        if not ts:
+            keys[i] = "unknown"
+    return keys
 
 
 def write_branch_manifest_row(writer, conv):
@@ -571,38 +701,135 @@ def write_branch_manifest_row(writer, conv):
     return 1
 
 
-def write_by_day_raw(conversations_iter, out_root, write_manifest=True, include_branch_labels=False):
+def write_by_day_raw(conversation_chunks, out_root, write_manifest=True, include_branch_labels=False):
     day_dir = os.path.join(out_root, "by_day")
     ensure_dir(day_dir)
     count = 0
     branch_count = 0
     manifest_path = os.path.join(out_root, "branch_manifest.jsonl")
     manifest = open(manifest_path, "w", encoding="utf-8") if write_manifest else None
+
+    # buffer lines per day key and flush in batches instead of re-opening
+    # the day file for every single message
+    buffers = defaultdict(list)
+    buffered_bytes = 0
+
+    # LRU of open append handles keyed by day; keeps open/close count at
+    # O(days) instead of O(flushes)
+    handles = OrderedDict()
+
+    def get_handle(dk):
+        w = handles.get(dk)
+        if w is not None:
+            handles.move_to_end(dk)
+            return w
+        if len(handles) >= DAY_HANDLE_CACHE_SIZE:
+            _, oldest = handles.popitem(last=False)
+            oldest.close()
+        raw_path = os.path.join(day_dir, f"{dk}.raw")
+        # unbuffered binary append: each flush below lands as one write()
+        # syscall instead of round-tripping the text/buffer layers
+        w = open(raw_path, "ab", buffering=0)
+        handles[dk] = w
+        return w
+
+    def close_handles():
+        while handles:
+            _, w = handles.popitem(last=False)
+            w.close()
+
+    def flush_day(dk):
+        nonlocal buffered_bytes
+        lines = buffers.pop(dk, None)
+        if not lines:
+            return
+        get_handle(dk).write("".join(lines).encode("utf-8"))
+        buffered_bytes -= sum(len(line) for line in lines)
+
+    def flush_all():
+        for dk in list(buffers.keys()):
+            flush_day(dk)
+
+    # messages are staged as (ts, role, content) and day-keyed in batches
+    # so day_keys_bulk can vectorize the timestamp->date conversion
+    pending = []
+
+    def route_pending():
+        nonlocal buffered_bytes
+        dks = day_keys_bulk([item[0] for item in pending])
+        for (ts, role, content), dk in zip(pending, dks):
+            line = "".join((str(ts), "\t[", to_iso(ts), "] ", role, ": ", content, "\n"))
+            lines = buffers[dk]
+            lines.append(line)
+            buffered_bytes += len(line)
+            if len(lines) >= DAY_FLUSH_LINES or buffered_bytes >= DAY_FLUSH_TOTAL_BYTES:
+                flush_day(dk)
+        pending.clear()
+
     try:
-        for conv in conversations_iter:
-            if manifest:
-                branch_count += write_branch_manifest_row(manifest, conv)
-            for m in conv.get("messages", []):
-                if not m.get("content"):
-                    continue
-                ts = m.get("ts", 0)
-                dk = day_key(ts)
-                raw_path = os.path.join(day_dir, f"{dk}.raw")
-                with open(raw_path, "a", encoding="utf-8") as w:
-                    content = (m.get("content") or "").replace("\n", " ")
+        for chunk in conversation_chunks:
+            for conv in chunk:
+                if manifest:
+                    branch_count += write_branch_manifest_row(manifest, conv)
+                branch = conv.get("branch") or {}
+                branch_label = ""
+                if include_branch_labels and branch.get("branch_id"):
+                    branch_label = branch.get("display_label") or branch.get("branch_label") or branch.get("branch_id")
+                for m in conv.get("messages", []):
+                    if not m.get("content"):
+                        continue
+                    ts = m.get("ts", 0)
+                    content = (m.get("content") or "").translate(_LINE_CLEAN)
                     role = m.get("role")
-                    branch = conv.get("branch") or {}
-                    if include_branch_labels and branch.get("branch_id"):
-                        role = f"{role} [{branch.get('display_label') or branch.get('branch_label') or branch.get('branch_id')}]"
-                    line = f"{ts}\t[{to_iso(ts)}] {role}: {content}\n"
-                    w.write(line)
-                count += 1
+                    if branch_label:
+                        role = f"{role} [{branch_label}]"
+                    pending.append((ts, role, content))
+                    count += 1
+                # route per full batch so day keying sees whole batches
+                if len(pending) >= DAY_FLUSH_LINES:
+                    route_pending()
     finally:
+        route_pending()
+        flush_all()
+        close_handles()
         if manifest:
             manifest.close()
     return count, branch_count
 
 
+def merge_month_days(day_paths, out_path):
+    counter = 0
+    with open(out_path, "wb", buffering=WRITE_BUFFER_SIZE) as w:
+        for day_path in day_paths:
+            with open(day_path, "rb") as r:
+                try:
+                    mm = mmap.mmap(r.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    continue  # empty day file
+            with mm:
+                # decorate-sort byte spans by timestamp (the first
+                # tab-separated token, always a plain integer since we
+                # wrote these lines); no decode, lines stay UTF-8 bytes
+                pairs = []
+                pos = 0
+                size = len(mm)
+                while pos < size:
+                    nl = mm.find(b"\n", pos)
+                    end = size if nl == -1 else nl
+                    tab = mm.find(b"\t", pos, end)
+                    if tab > pos:
+                        pairs.append((int(mm[pos:tab]), tab + 1, end))
+                    pos = end + 1
+                pairs.sort(key=itemgetter(0))
+                out = [
+                    b"%s ^msg-%06d\n" % (mm[s:e].strip(), i)
+                    for i, (_, s, e) in enumerate(pairs, start=counter + 1)
+                ]
+                counter += len(out)
+                w.writelines(out)
+    return counter
+
+
 def build_month_files(out_root):
     day_dir = os.path.join(out_root, "by_day")
     month_dir = os.path.join(out_root, "by_month")
@@ -610,57 +837,33 @@ def build_month_files(out_root):
     if not os.path.isdir(day_dir):
         return
 
-    day_files = sorted([f for f in os.listdir(day_dir) if f.endswith(".raw")])
-    month_counts = {}
+    day_files = sorted(
+        entry.name for entry in os.scandir(day_dir)
+        if entry.name.endswith(".raw") and entry.is_file()
+    )
+    # group day files per month so each month file is written in a single
+    # streaming pass; days inside a month are disjoint in time and sorted
+    # individually, so appending them in name order keeps the month sorted
+    month_groups = {}
     for day_file in day_files:
-        day_path = os.path.join(day_dir, day_file)
         day = day_file.replace(".raw", "")
-        if day == "unknown":
-            mkey = "unknown"
-        else:
-            mkey = day[:7]
-        out_path = os.path.join(month_dir, f"{mkey}.md")
-        with open(day_path, "r", encoding="utf-8") as r:
-            lines = r.readlines()
-        # sort by timestamp (ts is first tab-separated token)
-        def key_fn(line):
-            parts = line.split("\t", 1)
-            return safe_int(parts[0], 0)
-        lines.sort(key=key_fn)
-        with open(out_path, "a", encoding="utf-8") as w:
-            if mkey not in month_counts:
-                month_counts[mkey] = 0
-            for line in lines:
-                try:
-                    _, rest = line.split("\t", 1)
-                except ValueError:
-                    continue
-                month_counts[mkey] += 1
-                anchor = f"^msg-{month_counts[mkey]:06d}"
-                w.write(rest.strip() + f" {anchor}\n")
-
-
-def detect_topic_boundaries(lines, gap_hours, triggers):
-    markers = []
-    last_ts = None
-    for i, line in enumerate(lines):
-        m = re.match(r"\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]", line)
-        ts = None
-        if m:
-            try:
-                ts = int(dt.datetime.strptime(m.group(1), "%Y-%m-%d %H:%M:%S").timestamp())
-            except Exception:
-                ts = None
-        if last_ts and ts:
-            if ts - last_ts >= gap_hours * 3600:
-                markers.append(i)
-        if any(t in line for t in triggers):
-            markers.append(i)
-        if ts:
-            last_ts = ts
-    # always mark start
-    markers.append(0)
-    return sorted(set(markers))
+        mkey = "unknown" if day == "unknown" else day[:7]
+        month_groups.setdefault(mkey, []).append(day_file)
+
+    jobs = []
+    for mkey, files in month_groups.items():
+        day_paths = [os.path.join(day_dir, day_file) for day_file in files]
+        jobs.append((day_paths, os.path.join(month_dir, f"{mkey}.md")))
+
+    if len(jobs) <= 1:
+        for day_paths, out_path in jobs:
+            merge_month_days(day_paths, out_path)
+        return
+    # months are independent (anchors restart per month file), so merge
+    # them across cores; sort + formatting is CPU-bound per month
+    with ProcessPoolExecutor() as executor:
+        day_path_lists, out_paths = zip(*jobs)
+        list(executor.map(merge_month_days, day_path_lists, out_paths))
 
 
 def build_topic_preview(out_root, gap_hours=4, triggers=None):
@@ -669,24 +872,41 @@ def build_topic_preview(out_root, gap_hours=4, triggers=None):
     month_dir = os.path.join(out_root, "by_month")
     if not os.path.isdir(month_dir):
         return
-    for fname in sorted(os.listdir(month_dir)):
-        if not fname.endswith(".md"):
-            continue
+    trig_re = compile_trigger_regex(triggers)
+    gap_seconds = gap_hours * 3600
+    month_files = sorted(
+        entry.name for entry in os.scandir(month_dir)
+        if entry.name.endswith(".md") and entry.is_file()
+    )
+    for fname in month_files:
         path = os.path.join(month_dir, fname)
         with open(path, "r", encoding="utf-8") as r:
             lines = [ln.rstrip("\n") for ln in r.readlines()]
         if not lines:
             continue
-        markers = detect_topic_boundaries(lines, gap_hours, triggers)
+        # detect boundaries and emit in the same pass: a topic starts at
+        # the first line, after a time gap of gap_hours, or on a trigger
+        out = []
+        topic_idx = 0
+        last_ts = None
+        for i, line in enumerate(lines):
+            m = _TS_RE.match(line)
+            ts = parse_line_timestamp(m.group(1)) if m else None
+            is_boundary = (
+                i == 0
+                or (last_ts and ts and ts - last_ts >= gap_seconds)
+                or trig_re.search(line) is not None
+            )
+            if is_boundary:
+                topic_idx += 1
+                date_prefix = line[1:11] if line.startswith("[") else "unknown"
+                out.append(f"[TOPIC_START] {date_prefix} Topic-{topic_idx:03d}\n")
+            out.append(line + "\n")
+            if ts:
+                last_ts = ts
         preview_path = os.path.join(month_dir, fname.replace(".md", ".topics.md"))
-        with open(preview_path, "w", encoding="utf-8") as w:
-            topic_idx = 0
-            for i, line in enumerate(lines):
-                if i in markers:
-                    topic_idx += 1
-                    date_prefix = line[1:11] if line.startswith("[") else "unknown"
-                    w.write(f"[TOPIC_START] {date_prefix} Topic-{topic_idx:03d}\n")
-                w.write(line + "\n")
+        with open(preview_path, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as w:
+            w.writelines(out)
 
 
 def split_topics(out_root, month, topics_file):
@@ -701,7 +921,7 @@ def split_topics(out_root, month, topics_file):
         nonlocal current, buffer
         if not current:
             return
-        filename = re.sub(r"[^0-9A-Za-z\u4e00-\u9fa5_-]+", "_", current)
+        filename = _FNAME_RE.sub("_", current)
         path = os.path.join(by_topic_dir, f"{filename}.md")
         with open(path, "w", encoding="utf-8") as w:
             w.write("---\n")
@@ -724,13 +944,26 @@ def split_topics(out_root, month, topics_file):
     mapping_path = os.path.join(out_root, "by_topic", month, "event_anchor_mapping.csv")
     with open(mapping_path, "w", encoding="utf-8") as w:
         w.write("event_anchor,obsidian_path\n")
-        for fname in sorted(os.listdir(by_topic_dir)):
-            if not fname.endswith(".md"):
-                continue
+        topic_files = sorted(
+            entry.name for entry in os.scandir(by_topic_dir)
+            if entry.name.endswith(".md") and entry.is_file()
+        )
+        for fname in topic_files:
             anchor = fname.replace(".md", "")
             w.write(f"{anchor},{os.path.join('by_topic', month, fname)}\n")
 
 
+def iter_chunks(items, chunk_size=CONVERSATION_CHUNK_SIZE):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
 def load_conversations_stream(path, branch_mode="active"):
     # streaming array only
     for obj in iter_json_array(path):
@@ -738,6 +971,11 @@ def load_conversations_stream(path, branch_mode="active"):
             yield conv
 
 
+def load_conversations_stream_chunked(path, branch_mode="active", chunk_size=CONVERSATION_CHUNK_SIZE):
+    # chunked emit amortizes generator resumption overhead downstream
+    return iter_chunks(load_conversations_stream(path, branch_mode=branch_mode), chunk_size)
+
+
 def load_conversations_fallback(path, branch_mode="active"):
     # full load (large memory)
     with open_input_text(path) as f:
@@ -762,9 +1000,9 @@ def main():
     if args.stage == "month":
         # attempt streaming parse, fallback to full load if file is object
         try:
-            conv_iter = load_conversations_stream(args.input, branch_mode=args.branch_mode)
+            chunk_iter = load_conversations_stream_chunked(args.input, branch_mode=args.branch_mode)
             count, branch_count = write_by_day_raw(
-                conv_iter,
+                chunk_iter,
                 args.out,
                 include_branch_labels=args.branch_mode in {"edits", "all"}
             )
@@ -772,9 +1010,9 @@ def main():
             if input_payload_size(args.input) >= LARGE_INPUT_FALLBACK_LIMIT:
                 print(f"streaming parse failed for large input: {stream_error}", file=sys.stderr)
                 sys.exit(1)
-            conv_iter = load_conversations_fallback(args.input, branch_mode=args.branch_mode)
+            chunk_iter = iter_chunks(load_conversations_fallback(args.input, branch_mode=args.branch_mode))
             count, branch_count = write_by_day_raw(
-                conv_iter,
+                chunk_iter,
                 args.out,
                 include_branch_labels=args.branch_mode in {"edits", "all"}
             )